@@ -1,10 +1,17 @@
 import hashlib
 import hmac
 import time
-import base64
-import requests # You'll need to install this: pip install requests
+import math
+import binascii
+import urllib3 # You'll need to install this: pip install urllib3
+import certifi # CA bundle for TLS verification: pip install certifi
 import json
+import orjson # Fast JSON encode/decode: pip install orjson
 import os # To get environment variables, a safer way to handle secrets
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import NamedTuple
 
 # --- IMPORTANT: Replace these with your actual Robinhood API keys and secrets ---
 # NEVER hardcode sensitive information directly in your script for production.
@@ -16,100 +23,410 @@ import os # To get environment variables, a safer way to handle secrets
 # export RH_ACCOUNT_NUMBER="your_account_number_here"
 # -----------------------------------------------------------------------------
 
-# Get API keys from environment variables for security
-ROBINHOOD_API_KEY = os.getenv("RH_API_KEY", "YOUR_ROBINHOOD_API_KEY")
-ROBINHOOD_CLIENT_ID = os.getenv("RH_CLIENT_ID", "YOUR_ROBINHOOD_CLIENT_ID")
-ROBINHOOD_SHARED_SECRET = os.getenv("RH_SHARED_SECRET", "YOUR_ROBINHOOD_SHARED_SECRET")
-ROBINHOOD_ACCOUNT_NUMBER = os.getenv("RH_ACCOUNT_NUMBER", "YOUR_ROBINHOOD_ACCOUNT_NUMBER")
+log = logging.getLogger(__name__)
 
 # Base URL for Robinhood Crypto API
 # Corrected based on Robinhood documentation examples
 BASE_URL = "https://trading.robinhood.com/api/v1/crypto/"
 
+# Credentials, resolved once at import. This is the only place they are read
+# from the environment; everything else uses _CFG.
+@dataclass(frozen=True)
+class _Cfg:
+    api_key: str
+    client_id: str
+    # Shared secret, encoded once instead of on every signature. Kept out of
+    # repr() so logging or printing the config never shows it.
+    secret_b: bytes = field(repr=False)
+    account: str
+
+# Get API keys from environment variables for security
+_CFG = _Cfg(
+    api_key=os.getenv("RH_API_KEY", "YOUR_ROBINHOOD_API_KEY"),
+    client_id=os.getenv("RH_CLIENT_ID", "YOUR_ROBINHOOD_CLIENT_ID"),
+    secret_b=os.getenv("RH_SHARED_SECRET", "YOUR_ROBINHOOD_SHARED_SECRET").encode('utf-8'),
+    account=os.getenv("RH_ACCOUNT_NUMBER", "YOUR_ROBINHOOD_ACCOUNT_NUMBER"),
+)
+
+# --- Fixed API endpoints ---
+class Endpoint(NamedTuple):
+    """
+    An API endpoint with everything that is constant between calls worked out
+    once: the upper-cased method, the full URL, and METHOD + path encoded as
+    the bytes that get signed.
+    """
+    method: str
+    url: str
+    signed_b: bytes
+
+def _endpoint_parts(method, path):
+    """
+    Returns (METHOD, url, signed_b) for `method` and `path` (relative to
+    BASE_URL) as a plain tuple, for one-off requests.
+    """
+    method = method.upper()
+    return method, f"{BASE_URL}{path}", f"{method}{path}".encode('utf-8')
+
+def make_endpoint(method, path):
+    """
+    Builds an Endpoint for `method` and `path` (relative to BASE_URL).
+    """
+    return Endpoint(*_endpoint_parts(method, path))
+
+# Endpoints the bot hits on every loop, built once at import
+ACCOUNT_HOLDINGS_ENDPOINT = make_endpoint("GET", f"trading/accounts/{_CFG.account}/crypto_holdings/")
+ORDER_ENDPOINT = make_endpoint("POST", "trading/orders/")
+
+# Signing relies on hashlib's OpenSSL-backed SHA-256, which uses the CPU's
+# SHA extensions (SHA-NI) where available. A Python built without OpenSSL
+# falls back to a much slower builtin implementation, so warn about it.
+if hashlib.sha256.__name__ != "openssl_sha256":
+    log.warning("hashlib.sha256 is not OpenSSL-backed; request signing will be slow")
+
+# HMAC already keyed with the shared secret. Copying it skips absorbing the
+# inner/outer key pads again, which is a large share of the cost of signing
+# short messages.
+_HMAC_TEMPLATE = hmac.new(_CFG.secret_b, None, hashlib.sha256)
+
+# Headers that are identical for every request. Each request copies this
+# template and only fills in the signature and timestamp.
+_BASE_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    "X-Robinhood-API-Key": _CFG.api_key, # Or similar, check docs
+    "X-Robinhood-Client-Id": _CFG.client_id, # Or similar
+    # "Authorization": f"Bearer {your_auth_token_if_any}", # Some APIs use this too
+    # Ask for compressed responses (urllib3 alone sends "identity"); urllib3
+    # decompresses them transparently, including while streaming.
+    **urllib3.util.make_headers(accept_encoding=True),
+}
+
+# One shared connection pool for every request. It keeps TCP/TLS connections
+# to the API host alive between calls instead of doing a fresh handshake each
+# time. urllib3 is used directly rather than through requests to skip the
+# per-call Request/PreparedRequest/cookie bookkeeping. Unlike requests, it
+# does not pick up HTTPS_PROXY or other proxy environment variables.
+#
+# Nothing is ever retried and redirects are not followed: urllib3 re-sends a
+# POST with its body and signature on a 301/302, so following them could
+# place an order twice (and the signature covers the original path anyway).
+# A 3xx is returned as-is and reported as an error like a 4xx/5xx. TLS is
+# verified against certifi's CA bundle, like requests, rather than the
+# system store.
+_POOL_MAXSIZE = 16
+_POOL = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=_POOL_MAXSIZE,
+    cert_reqs='CERT_REQUIRED',
+    ca_certs=certifi.where(),
+    retries=urllib3.Retry(total=0, read=False, redirect=0, raise_on_redirect=False),
+)
+
+# Worker threads for make_authenticated_requests, created once like _POOL and
+# sized to it so every worker can hold a pooled connection.
+_EXECUTOR = ThreadPoolExecutor(max_workers=_POOL_MAXSIZE)
+
+# --- Helper to base64-encode a signature digest ---
+def _b64(digest):
+    """
+    Returns the HMAC digest base64-encoded as str (single C call, no
+    trailing newline).
+    """
+    return binascii.b2a_base64(digest, newline=False).decode('ascii')
+
+# --- Helper that computes every request signature ---
+def _sign(timestamp, signed_b, body=b""):
+    """
+    Signs timestamp + `signed_b` (METHOD + path as bytes, see
+    Endpoint.signed_b) + `body` with the pre-keyed `_HMAC_TEMPLATE`.
+
+    The parts are fed to the HMAC one after another, so the body is never
+    copied into an intermediate str or bytes object.
+    """
+    h = _HMAC_TEMPLATE.copy()
+    h.update(timestamp.encode('ascii'))
+    h.update(signed_b)
+    h.update(body)
+    return _b64(h.digest())
+
 # --- Function to generate the HMAC-SHA256 signature ---
 # This is a critical part of the authentication process.
 # The actual details of what data to sign and how might vary slightly,
 # so ALWAYS refer to the latest Robinhood documentation for accuracy.
-def generate_signature(api_key, client_id, secret, timestamp, method, path, body=""):
+def generate_signature(timestamp, method, path, body=b""):
     """
     Generates an HMAC-SHA256 signature for Robinhood Crypto API requests.
     This is a simplified example. Refer to Robinhood's official documentation
     for the exact signature generation algorithm (e.g., what parts of the
     request should be included in the message to be signed).
+
+    The message is signed with the module's shared secret; `body` is the
+    already-serialized request body as bytes.
     """
     # The message to be signed typically includes elements like:
     # timestamp, method (GET/POST/etc.), path, and request body (if any).
     # For this example, let's assume it's a concatenation of these.
     # Robinhood's documentation might specify a specific string format.
-    message = f"{timestamp}{method.upper()}{path}{body}"
-    
-    # Encode the secret key and message
-    secret_bytes = secret.encode('utf-8')
-    message_bytes = message.encode('utf-8')
+    return _sign(timestamp, f"{method.upper()}{path}".encode('utf-8'), body)
 
-    # Create the HMAC-SHA256 hash
-    hashed = hmac.new(secret_bytes, message_bytes, hashlib.sha256).digest()
-    
-    # Base64 encode the result
-    signature = base64.b64encode(hashed).decode('utf-8')
-    return signature
+# --- Function to sign a batch of child orders in one pass ---
+def generate_signatures(timestamp, method, path, bodies):
+    """
+    Generates signatures for several request bodies that share the same
+    timestamp, method and path, e.g. one logical order sliced into N child
+    orders.
 
-# --- Function to make an authenticated API request ---
-def make_authenticated_request(method, path, data=None):
+    The shared message prefix is fed into the keyed HMAC once; each body then
+    only costs a state copy plus hashing its own bytes. Returns the
+    signatures in the same order as `bodies`. request_endpoint_batch uses
+    this to send the signed child orders.
     """
-    Makes an authenticated request to the Robinhood Crypto API.
+    return _sign_batch(timestamp, f"{method.upper()}{path}".encode('utf-8'), bodies)
+
+# --- Helper behind generate_signatures, taking Endpoint.signed_b ---
+def _sign_batch(timestamp, signed_b, bodies):
+    """
+    Signs each of `bodies` with the shared timestamp + `signed_b` prefix.
+    """
+    prefix = _HMAC_TEMPLATE.copy()
+    prefix.update(timestamp.encode('ascii'))
+    prefix.update(signed_b)
+
+    signatures = []
+    for body in bodies:
+        h = prefix.copy()
+        h.update(body)
+        signatures.append(_b64(h.digest()))
+    return signatures
+
+# --- Helper to reject values JSON can't represent ---
+def _check_finite(value):
+    """
+    Raises ValueError if `value` contains NaN or Infinity anywhere.
+
+    orjson silently serializes them as null, so a NaN price or quantity
+    would otherwise go out in an order body as null.
+    """
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"Out of range float value in request body: {value!r}")
+    elif isinstance(value, dict):
+        for item in value.values():
+            _check_finite(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _check_finite(item)
+
+# --- Helper to serialize a request body ---
+def _serialize(data):
+    """
+    Returns `data` as compact JSON bytes (b"" for no data). Raises ValueError
+    if it contains NaN or Infinity.
     """
-    timestamp = str(int(time.time() * 1000)) # Current timestamp in milliseconds
-    
     # Prepare request body if it's a POST/PUT request
-    body = ""
-    if data:
-        body = json.dumps(data)
+    # The body is serialized exactly once; the same bytes are signed and sent,
+    # so the signature always matches what goes over the wire.
+    if not data:
+        return b""
+    _check_finite(data)
+    return orjson.dumps(data) # Compact JSON, already bytes
+
+# --- Helper to sign a request and build what the HTTP layer needs ---
+def _prepare_request(method, url, signed_b, data=None):
+    """
+    Serializes and signs a request (the arguments are an Endpoint's fields).
+    Returns (headers, body) ready to pass to _POOL.request. Raises ValueError
+    if `data` contains NaN or Infinity.
+    """
+    timestamp = str(time.time_ns() // 1_000_000) # Current timestamp in milliseconds
+    body = _serialize(data)
     
     # Generate the signature
-    signature = generate_signature(
-        ROBINHOOD_API_KEY, 
-        ROBINHOOD_CLIENT_ID, 
-        ROBINHOOD_SHARED_SECRET, 
-        timestamp, 
-        method, 
-        path, 
-        body
-    )
+    signature = _sign(timestamp, signed_b, body)
+    return _build_headers(method, url, body, timestamp, signature), body
 
-    # Set up the request headers
+# --- Helper to build the headers for an already-signed request ---
+def _build_headers(method, url, body, timestamp, signature):
+    """
+    Returns the full header dict for a request signed with `signature` at
+    `timestamp`.
+    """
+    # Set up the per-request authentication headers
     # These headers are crucial for authentication.
     # The exact header names might vary, refer to Robinhood's docs.
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "X-Robinhood-API-Key": ROBINHOOD_API_KEY, # Or similar, check docs
-        "X-Robinhood-Client-Id": ROBINHOOD_CLIENT_ID, # Or similar
-        "X-Robinhood-Signature": signature,
-        "X-Robinhood-Timestamp": timestamp,
-        # "Authorization": f"Bearer {your_auth_token_if_any}", # Some APIs use this too
-    }
+    headers = _BASE_HEADERS.copy()
+    headers["X-Robinhood-Signature"] = signature
+    headers["X-Robinhood-Timestamp"] = timestamp
+
+    # Request details are only formatted when DEBUG logging is enabled,
+    # so a live bot pays nothing for them.
+    if log.isEnabledFor(logging.DEBUG):
+        # Headers are deliberately not logged: they carry the API key and
+        # the freshly computed signature.
+        log.debug("Making %s request to: %s", method, url)
+        if body:
+            log.debug("Body: %s", body.decode('utf-8'))
 
-    url = f"{BASE_URL}{path}"
-    print(f"Making {method} request to: {url}")
-    print(f"Headers: {json.dumps(headers, indent=2)}")
-    if data:
-        print(f"Body: {body}")
+    return headers
+
+# --- Function to make an authenticated API request ---
+def make_authenticated_request(method, path, data=None):
+    """
+    Makes an authenticated request to the Robinhood Crypto API.
 
+    For endpoints called in a loop, build an Endpoint once (see
+    make_endpoint) and call request_endpoint instead.
+    """
+    return _request(*_endpoint_parts(method, path), data)
+
+# --- Function to make an authenticated request to a prebuilt endpoint ---
+def request_endpoint(endpoint, data=None):
+    """
+    Makes an authenticated request to `endpoint`, e.g.
+    ACCOUNT_HOLDINGS_ENDPOINT. Returns the decoded JSON, or None on errors.
+    """
+    return _request(*endpoint, data)
+
+# --- Helper that sends a request and decodes the response ---
+def _request(method, url, signed_b, data=None):
+    """
+    Signs and sends a request; shared by make_authenticated_request and
+    request_endpoint. Returns the decoded JSON, or None on errors.
+    """
+    try:
+        headers, body = _prepare_request(method, url, signed_b, data)
+    except ValueError as err:
+        log.error("Invalid request body: %s", err)
+        return None
+    return _send(method, url, headers, body)
+
+# --- Helper that sends a prepared request and decodes the response ---
+def _send(method, url, headers, body):
+    """
+    Sends an already-signed request. Returns the decoded JSON, or None on
+    errors.
+    """
     try:
-        response = requests.request(method, url, headers=headers, json=data)
-        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.HTTPError as err:
-        print(f"HTTP Error: {err}")
-        print(f"Response Content: {response.text}")
+        response = _POOL.request(method, url, body=body or None, headers=headers)
+    except urllib3.exceptions.HTTPError as err:
+        log.error("Request Error: %s", err)
         return None
-    except requests.exceptions.RequestException as err:
-        print(f"Request Error: {err}")
+
+    # Check for HTTP errors (unfollowed 3xx redirects, 4xx or 5xx) directly
+    # instead of raising and catching an exception, which is costly in a
+    # retry-heavy loop (e.g. 429s).
+    status_code = response.status
+    if status_code >= 300:
+        log.warning("HTTP %d: %s", status_code, response.data[:200].decode('utf-8', 'replace'))
+        return None
+
+    try:
+        return orjson.loads(response.data)
+    except orjson.JSONDecodeError as err:
+        log.error("Invalid JSON in response: %s", err)
+        return None
+
+# --- Error raised for HTTP error responses while streaming ---
+class APIError(Exception):
+    """
+    An HTTP error response (3xx redirect, 4xx or 5xx) from the API. `status`
+    holds the status code.
+    """
+    def __init__(self, status, text):
+        super().__init__(f"HTTP {status}: {text}")
+        self.status = status
+
+# --- Function to stream selected items out of a large API response ---
+def iter_authenticated_items(endpoint, prefix, data=None):
+    """
+    Makes an authenticated request to `endpoint` (e.g.
+    ACCOUNT_HOLDINGS_ENDPOINT, or one built with make_endpoint) and yields
+    only the JSON values found at `prefix` (ijson syntax, e.g.
+    "results.item" or "results.item.bid_price") while the response is still
+    being read.
+
+    Use this instead of request_endpoint for large holdings pages or
+    order-book snapshots when only a few fields are needed: the full document
+    is never materialized as Python dicts and lists.
+
+    Unlike make_authenticated_request, errors are raised rather than turned
+    into an empty result: APIError for 3xx/4xx/5xx responses,
+    urllib3.exceptions.HTTPError for connection problems, ijson.JSONError
+    for malformed JSON and ValueError for NaN/Infinity in `data`. Finishing without yielding anything always means the
+    response had no items at `prefix`.
+    """
+    import ijson # Only needed for streaming: pip install ijson
+
+    method, url, signed_b = endpoint
+    headers, body = _prepare_request(method, url, signed_b, data)
+    response = _POOL.request(
+        method, url, body=body or None, headers=headers, preload_content=False
+    )
+
+    consumed = False
+    try:
+        status_code = response.status
+        if status_code >= 300:
+            raise APIError(status_code, response.read(200).decode('utf-8', 'replace'))
+
+        # The response is file-like and undoes gzip/deflate as it is read.
+        yield from ijson.items(response, prefix)
+        consumed = True
+    finally:
+        if consumed:
+            response.release_conn()
+        else:
+            # Stopped early (error, or the caller broke out of the loop):
+            # drop the connection rather than reading and decompressing the
+            # rest of a possibly large body just to reuse it.
+            response.close()
+
+# --- Function to make several authenticated API requests concurrently ---
+def make_authenticated_requests(calls):
+    """
+    Runs a batch of authenticated requests in parallel and returns their
+    results in the same order.
+
+    `calls` is an iterable of (method, path, data) tuples, e.g. a quote poll
+    plus a few order placements. Each call is signed independently and sent
+    over the shared connection pool by the shared worker threads, so network
+    waits overlap instead of running one after another.
+    """
+    return list(_EXECUTOR.map(lambda call: make_authenticated_request(*call), calls))
+
+# --- Function to send child orders signed in one pass ---
+def request_endpoint_batch(endpoint, data_list):
+    """
+    Sends several bodies to one endpoint concurrently, e.g. the child orders
+    of one logical order sent to ORDER_ENDPOINT. All of them share one
+    timestamp, so they are signed in a single pass (see generate_signatures)
+    before any is sent. Returns the results in the same order, or None
+    without sending anything if any body contains NaN or Infinity.
+
+    Identical bodies would get identical timestamp + signature pairs, so give
+    each child order something unique (e.g. a client order id).
+    """
+    method, url, signed_b = endpoint
+    try:
+        bodies = [_serialize(data) for data in data_list]
+    except ValueError as err:
+        log.error("Invalid request body: %s", err)
         return None
 
+    timestamp = str(time.time_ns() // 1_000_000) # Current timestamp in milliseconds
+    signatures = _sign_batch(timestamp, signed_b, bodies)
+
+    def send(body, signature):
+        headers = _build_headers(method, url, body, timestamp, signature)
+        return _send(method, url, headers, body)
+
+    return list(_EXECUTOR.map(send, bodies, signatures))
+
 # --- Example Usage (THIS IS A MOCK EXAMPLE, NO REAL API CALL WILL BE MADE WITHOUT A VALID BASE_URL AND AUTH) ---
 if __name__ == "__main__":
+    # Set to logging.DEBUG to see every request's URL and body.
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
     print("--- Starting Trading Bot Setup Example ---")
     print("WARNING: This is a conceptual example. Actual Robinhood API calls require")
     print("         valid API keys, shared secrets, and precise adherence to their")
@@ -119,11 +436,11 @@ if __name__ == "__main__":
     print("-" * 40)
 
     # Example: Trying to get account information (hypothetical endpoint)
-    # You would replace 'accounts' with the actual endpoint for crypto accounts
+    # You would replace the path in ACCOUNT_HOLDINGS_ENDPOINT with the actual endpoint for crypto accounts
     # The path should match what Robinhood expects, e.g., 'accounts/crypto/'
     print("\nAttempting to fetch hypothetical crypto account info...")
-    account_path = f"trading/accounts/{ROBINHOOD_ACCOUNT_NUMBER}/crypto_holdings/" # Example path, relative to BASE_URL
-    account_info = make_authenticated_request("GET", account_path)
+    account_endpoint = ACCOUNT_HOLDINGS_ENDPOINT # Prebuilt GET endpoint (see make_endpoint)
+    account_info = request_endpoint(account_endpoint)
 
     if account_info:
         print("\nHypothetical Account Info Received (MOCK):")
@@ -135,7 +452,7 @@ if __name__ == "__main__":
     # Example: Placing a hypothetical buy order (POST request)
     # Again, this is a mock. You need the actual endpoint and body structure.
     print("\nAttempting to place a hypothetical buy order...")
-    order_path = "trading/orders/" # Example path, relative to BASE_URL
+    order_endpoint = ORDER_ENDPOINT # Prebuilt POST endpoint (see make_endpoint)
     buy_order_data = {
         "instrument_id": "some-crypto-id", # Replace with actual crypto instrument ID
         "quantity": "0.001",
@@ -154,14 +471,14 @@ if __name__ == "__main__":
     }
 
     # Simulate a successful response for demonstration, as a real API call won't work with placeholders
-    # For a real scenario, you'd process the `response.json()` from `make_authenticated_request`
-    if ROBINHOOD_API_KEY == "YOUR_ROBINHOOD_API_KEY": # Check if using default placeholders
+    # For a real scenario, you'd process the decoded JSON returned by `request_endpoint`
+    if _CFG.api_key == "YOUR_ROBINHOOD_API_KEY": # Check if using default placeholders
         print("\nUsing placeholder API keys, simulating a successful order response for demonstration.")
         print("\nHypothetical Buy Order Placed (MOCK):")
         print(json.dumps(mock_successful_order_response, indent=2))
     else:
         # In a real scenario, you'd call:
-        # order_response = make_authenticated_request("POST", order_path, data=buy_order_data)
+        # order_response = request_endpoint(order_endpoint, data=buy_order_data)
         # if order_response:
         #     print("\nHypothetical Buy Order Placed (REAL API CALL):")
         #     print(json.dumps(order_response, indent=2))